@@ -1,18 +1,240 @@
 import os
-import json
-from typing import Optional, Dict, Any, List
-from datetime import datetime
-
-from fastapi import FastAPI, HTTPException, Body
-from fastapi.responses import HTMLResponse, Response, StreamingResponse, JSONResponse
+import gzip
+import logging
+import asyncio
+import hashlib
+import time
+import tempfile
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, List, Union
+from datetime import datetime, timezone
+from fastapi import FastAPI, HTTPException, Request, Query
+from fastapi.responses import HTMLResponse, Response, StreamingResponse, FileResponse
+from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from brotli_asgi import BrotliMiddleware
+from pymongo import AsyncMongoClient
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError
+from pymongo.write_concern import WriteConcern
+from pydantic import BaseModel, ConfigDict, PrivateAttr, model_validator
 import httpx
+import orjson
 import zipfile
-from io import BytesIO
+from pathlib import Path, PurePosixPath
+from urllib.parse import urlsplit
+
+# Leaves handlers alone if the server (or a test runner) configured logging first
+logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s: %(message)s")
+logger = logging.getLogger("emogo")
+# httpx logs every request at INFO, i.e. one line per video in a ZIP export
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Upper bound on documents coalesced into a single insert_many
+WRITE_BATCH_MAX = 500
+
+# Server error code for a unique index violation (here: a retried dedupKey)
+DUPLICATE_KEY_ERROR = 11000
+
+
+class WriteBuffer:
+    """Coalesces concurrent single-document inserts into one insert_many
+
+    While a flush is in flight, new documents queue up and go out together in
+    the next one, so under load each Mongo round trip carries many writes.
+    Callers still wait for their own document to be acknowledged. A retried
+    document (same dedupKey) resolves to the _id of the one already stored.
+    _ids are assigned when a batch goes out, not when a document is queued,
+    so they stay in commit order for exports that resume from the last _id.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+    async def insert(self, doc: Dict[str, Any]) -> ObjectId:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((doc, future))
+        return await future
+
+    async def run(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < WRITE_BATCH_MAX and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            await self.flush(batch)
+
+    async def flush(self, batch):
+        failed: Dict[int, Exception] = {}
+        duplicates: Dict[int, bytes] = {}
+        # Known without reading the insert result
+        for doc, _ in batch:
+            doc["_id"] = ObjectId()
+        try:
+            await self.collection.insert_many([doc for doc, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            # Unordered: only the documents listed in writeErrors were rejected
+            for error in e.details.get("writeErrors", []):
+                doc = batch[error["index"]][0]
+                if error.get("code") == DUPLICATE_KEY_ERROR and "dedupKey" in doc:
+                    duplicates[error["index"]] = doc["dedupKey"]
+                else:
+                    failed[error["index"]] = Exception(error.get("errmsg", "write error"))
+        except Exception as e:
+            failed = {i: e for i in range(len(batch))}
+        
+        existing: Dict[bytes, ObjectId] = {}
+        if duplicates:
+            try:
+                cursor = self.collection.find({"dedupKey": {"$in": list(set(duplicates.values()))}}, {"dedupKey": 1})
+                existing = {doc["dedupKey"]: doc["_id"] async for doc in cursor}
+            except Exception as e:
+                failed.update({i: e for i in duplicates})
+        
+        for i, (doc, future) in enumerate(batch):
+            if future.done():
+                continue
+            if i in failed:
+                future.set_exception(failed[i])
+            elif i in duplicates:
+                if duplicates[i] in existing:
+                    future.set_result(existing[duplicates[i]])
+                else:
+                    future.set_exception(Exception("duplicate entry could not be resolved"))
+            else:
+                future.set_result(doc["_id"])
+
+
+# (collection, keys, options) for every index created at startup
+INDEXES = [
+    *((kind, "timestamp", {}) for kind in ("vlogs", "sentiments", "gps")),
+    # Per-user, newest-first reads (equality on userId, then sort/range on time)
+    *((kind, [("userId", 1), ("timestamp", -1)], {}) for kind in ("vlogs", "sentiments", "gps")),
+    ("gps", [("location", "2dsphere")], {}),
+    # Client retries of the same entry collide here instead of duplicating it
+    *(
+        (kind, "dedupKey", {"unique": True, "partialFilterExpression": {"dedupKey": {"$exists": True}}})
+        for kind in ("vlogs", "sentiments", "gps")
+    ),
+]
+
+
+async def create_indexes(db):
+    """Create the indexes for better query performance, logging any that fail
+
+    A failed build (e.g. the 2dsphere index over an existing malformed
+    location) only costs that index; the database stays usable.
+    """
+    # They are independent, so build them concurrently
+    results = await asyncio.gather(
+        *(db[kind].create_index(keys, **options) for kind, keys, options in INDEXES),
+        return_exceptions=True,
+    )
+    failed = 0
+    for (kind, keys, _), result in zip(INDEXES, results):
+        if isinstance(result, Exception):
+            failed += 1
+            logger.error("❌ Failed to create index %s on %s: %s", keys, kind, result)
+    if not failed:
+        logger.info("✅ Database indexes created")
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the MongoDB and HTTP clients on startup and close them on shutdown"""
+    mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+    app.state.mongo = None
+    app.state.db = None
+    app.state.collections = {}
+    app.state.writers = {}
+    
+    # Shared HTTP client so media downloads reuse pooled keep-alive connections
+    app.state.http = httpx.AsyncClient(
+        timeout=30.0,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        http2=True,
+        # Storage links often redirect to a CDN or signed URL
+        follow_redirects=True,
+    )
+    
+    try:
+        # Native asyncio driver: no thread-pool hop per operation, and BSON is
+        # decoded on the event loop instead of in worker threads
+        mongo_client = AsyncMongoClient(
+            mongo_uri,
+            maxPoolSize=50,
+            minPoolSize=10,
+            maxIdleTimeMS=60000,
+            # When all 50 connections are busy, fail a request after 2s instead
+            # of queueing it behind the backlog indefinitely
+            waitQueueTimeoutMS=2000,
+            # Fail fast on startup and on requests when the cluster is unreachable
+            serverSelectionTimeoutMS=3000,
+            # Don't let a stalled socket hold a pooled connection forever
+            socketTimeoutMS=45000,
+            retryWrites=True,
+            compressors="zstd,zlib",
+            # Return BSON dates as aware UTC datetimes so exports carry the offset
+            tz_aware=True,
+        )
+        app.state.mongo = mongo_client
+        db_name = os.getenv("MONGO_DB", "emogo")
+        db = mongo_client[db_name]
+        
+        # Test the connection
+        await mongo_client.admin.command('ping')
+        logger.info("✅ Connected to MongoDB: %s", db_name)
+        
+        # Telemetry writes only wait for the primary to apply them, not for the
+        # journal flush. Collections listed in MONGO_UNACKED_KINDS (e.g.
+        # "gps,sentiments") skip the acknowledgement entirely: faster, but a
+        # rejected write is silently lost
+        unacked = {kind.strip() for kind in os.getenv("MONGO_UNACKED_KINDS", "").split(",") if kind.strip()}
+        app.state.collections = {
+            kind: db.get_collection(
+                kind,
+                write_concern=WriteConcern(w=0) if kind in unacked else WriteConcern(w=1, j=False),
+            )
+            for kind in ("vlogs", "sentiments", "gps")
+        }
+        
+        # Single-document POSTs are coalesced per collection
+        app.state.writers = {kind: WriteBuffer(coll) for kind, coll in app.state.collections.items()}
+        for writer in app.state.writers.values():
+            writer.start()
+        app.state.db = db
+        
+    except Exception as e:
+        logger.error("❌ Failed to connect to MongoDB: %s", e)
+        logger.error("MongoDB URI: %s", mongo_uri)
+        # Don't fail startup, but app.state.db will be None
+    
+    if app.state.db is not None:
+        await create_indexes(app.state.db)
+    
+    yield
+    
+    for writer in app.state.writers.values():
+        await writer.stop()
+    await app.state.http.aclose()
+    if app.state.mongo is not None:
+        await app.state.mongo.close()
+        logger.info("MongoDB connection closed")
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware to allow frontend requests
 app.add_middleware(
@@ -21,37 +243,82 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Last-Id", "ETag"],
+)
+
+# Compress JSON exports on the fly; responses that already carry a
+# Content-Encoding (the pre-gzipped viewer) pass through.
+# Brotli sits inside gzip: clients that accept br get it, and the outer gzip
+# layer then sees the Content-Encoding and leaves the body alone. Everyone
+# else still gets gzip at level 5. Quality 5 is the lowest level that beats
+# gzip -5 on streamed export chunks; below that brotli comes out larger.
+# The ZIP holds already-compressed media: brotli skips its route, and gzip
+# skips application/zip by default
+app.add_middleware(
+    BrotliMiddleware, quality=5, minimum_size=1024, gzip_fallback=False,
+    excluded_handlers=[r"^/export/vlogs/zip$"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
-# MongoDB client will be created at startup
-mongo_client: Optional[AsyncIOMotorClient] = None
-db = None
+# MongoDB and HTTP clients live on app.state, created by lifespan()
+app.state.mongo = None
+app.state.db = None
 
 
-# Pydantic models for request validation
-class VlogData(BaseModel):
+# Pydantic models for request validation. Unknown fields are kept so clients
+# can still send extra keys alongside the documented ones
+class EntryData(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    _server_timestamp: bool = PrivateAttr(default=False)
+    
+    @model_validator(mode="after")
+    def default_timestamp(self):
+        # Add server timestamp if not provided; stored as a BSON date
+        if self.timestamp is None:
+            self.timestamp = datetime.now(timezone.utc)
+            self._server_timestamp = True
+        return self
+    
+    def to_document(self) -> Dict[str, Any]:
+        """The Mongo document for this entry, with a dedupKey when it can be retried safely"""
+        doc = self.model_dump(exclude_none=True)
+        # _ids are always server-assigned: exports order and resume by them
+        doc.pop("_id", None)
+        # Only the server sets dedupKey; a client-sent one would make distinct
+        # entries collide on the unique index and be dropped as retries
+        doc.pop("dedupKey", None)
+        # An entry the client timestamped is identical on every retry, so a
+        # hash of it identifies the entry; server-stamped ones can't be matched
+        if not self._server_timestamp:
+            doc["dedupKey"] = hashlib.blake2b(
+                orjson.dumps(doc, option=orjson.OPT_SORT_KEYS), digest_size=12
+            ).digest()
+        return doc
+
+
+class VlogData(EntryData):
     media_url: Optional[str] = None
     video_url: Optional[str] = None
     audio_url: Optional[str] = None
     url: Optional[str] = None
     vlog: Optional[str] = None
     userId: Optional[str] = None
-    timestamp: Optional[str] = None
+    timestamp: Optional[Union[str, datetime]] = None
     metadata: Optional[Dict[str, Any]] = None
 
 
-class SentimentData(BaseModel):
+class SentimentData(EntryData):
     score: Optional[float] = None
     sentiment: Optional[str] = None
     value: Optional[float] = None
     polarity: Optional[float] = None
     userId: Optional[str] = None
-    timestamp: Optional[str] = None
+    timestamp: Optional[Union[str, datetime]] = None
     text: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
 
 
-class GPSData(BaseModel):
+class GPSData(EntryData):
     latitude: Optional[float] = None
     longitude: Optional[float] = None
     lat: Optional[float] = None
@@ -60,48 +327,111 @@ class GPSData(BaseModel):
     long: Optional[float] = None
     coords: Optional[List[float]] = None
     userId: Optional[str] = None
-    timestamp: Optional[str] = None
+    timestamp: Optional[Union[str, datetime]] = None
     accuracy: Optional[float] = None
     metadata: Optional[Dict[str, Any]] = None
 
 
-@app.on_event("startup")
-async def startup_db_client():
-    global mongo_client, db
-    mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+class BatchPayload(BaseModel):
+    vlogs: List[VlogData] = []
+    sentiments: List[SentimentData] = []
+    gps: List[GPSData] = []
+
+
+def _coordinate(value) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+def gps_location(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Normalise the accepted lat/lng spellings into a GeoJSON point for the 2dsphere index"""
+    coords = data.get("coords")
+    if isinstance(coords, list) and len(coords) >= 2:
+        lat, lng = _coordinate(coords[0]), _coordinate(coords[1])
+    else:
+        lat = _coordinate(next((data[k] for k in ("lat", "latitude") if data.get(k) is not None), None))
+        lng = _coordinate(next((data[k] for k in ("long", "lng", "longitude", "lon") if data.get(k) is not None), None))
     
-    try:
-        mongo_client = AsyncIOMotorClient(mongo_uri)
-        db_name = os.getenv("MONGO_DB", "emogo")
-        db = mongo_client[db_name]
-        
-        # Test the connection
-        await mongo_client.admin.command('ping')
-        print(f"✅ Connected to MongoDB: {db_name}")
-        
-        # Create indexes for better query performance
-        await db.vlogs.create_index("timestamp")
-        await db.sentiments.create_index("timestamp")
-        await db.gps.create_index("timestamp")
-        print("✅ Database indexes created")
-        
-    except Exception as e:
-        print(f"❌ Failed to connect to MongoDB: {e}")
-        print(f"MongoDB URI: {mongo_uri}")
-        # Don't fail startup, but db will be None
+    # Out-of-range points would make the insert fail on the 2dsphere index
+    if lat is None or lng is None or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return {"type": "Point", "coordinates": [lng, lat]}
 
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    global mongo_client
-    if mongo_client:
-        mongo_client.close()
-        print("MongoDB connection closed")
+def set_gps_location(doc: Dict[str, Any]):
+    """Store the derived GeoJSON point as location, dropping any location the client sent
+
+    A client-supplied location is arbitrary data that the 2dsphere index
+    would reject, failing the whole insert.
+    """
+    location = gps_location(doc)
+    if location is None:
+        doc.pop("location", None)
+    else:
+        doc["location"] = location
+
+
+# Probes from the load balancer, uptime checks and the viewer share one ping
+HEALTH_CACHE_TTL = 1.5
+_health_cache: Dict[str, Any] = {"checked_at": float("-inf"), "error": None}
+_health_lock = asyncio.Lock()
+
+
+async def ping_database():
+    """Ping MongoDB at most once per HEALTH_CACHE_TTL, re-raising a cached failure"""
+    if time.monotonic() - _health_cache["checked_at"] >= HEALTH_CACHE_TTL:
+        async with _health_lock:
+            # Another request may have refreshed it while this one waited
+            if time.monotonic() - _health_cache["checked_at"] >= HEALTH_CACHE_TTL:
+                error = None
+                try:
+                    await app.state.mongo.admin.command('ping')
+                except Exception as e:
+                    error = e
+                _health_cache.update(checked_at=time.monotonic(), error=error)
+    
+    if _health_cache["error"] is not None:
+        raise _health_cache["error"]
+
+
+# Bumped on every write, so a read that raced a write doesn't cache its result
+_write_generation = {"value": 0}
+
+# Counts change slowly compared with how often the viewer polls /; writes
+# through this process drop the cached value so new entries show up at once
+COUNTS_CACHE_TTL = 30
+_counts_cache: Dict[str, Any] = {"expires_at": float("-inf"), "counts": None}
+
+
+async def collection_counts() -> List[Any]:
+    """Estimated vlogs/sentiments/gps counts (or the exception per failed count), cached briefly"""
+    if time.monotonic() < _counts_cache["expires_at"]:
+        return _counts_cache["counts"]
+    
+    db = app.state.db
+    generation = _write_generation["value"]
+    counts = await asyncio.gather(
+        db.vlogs.estimated_document_count(),
+        db.sentiments.estimated_document_count(),
+        db.gps.estimated_document_count(),
+        return_exceptions=True,
+    )
+    # A count that started before a write may not include it
+    if generation == _write_generation["value"] and not any(isinstance(count, Exception) for count in counts):
+        _counts_cache.update(expires_at=time.monotonic() + COUNTS_CACHE_TTL, counts=counts)
+    return counts
+
+
+def invalidate_read_caches():
+    """Forget cached reads that can't tell a write happened on their own"""
+    _write_generation["value"] += 1
+    _counts_cache["expires_at"] = float("-inf")
 
 
 @app.get("/")
 async def root():
-    if db is None:
+    if app.state.db is None:
         return {
             "message": "EmoGo backend is running",
             "status": "error",
@@ -109,42 +439,41 @@ async def root():
             "note": "Check MONGO_URI environment variable"
         }
     
-    try:
-        # Test database connection
-        await mongo_client.admin.command('ping')
-        
-        # Get collection counts
-        vlogs_count = await db.vlogs.count_documents({})
-        sentiments_count = await db.sentiments.count_documents({})
-        gps_count = await db.gps.count_documents({})
-        
-        return {
-            "message": "EmoGo backend is running",
-            "status": "ok",
-            "database": "connected",
-            "collections": {
-                "vlogs": vlogs_count,
-                "sentiments": sentiments_count,
-                "gps": gps_count
-            }
-        }
-    except Exception as e:
+    # The ping and the counts are independent, so they share one round trip.
+    # Counts come from collection metadata (O(1))
+    ping, counts = await asyncio.gather(ping_database(), collection_counts(), return_exceptions=True)
+    if isinstance(ping, Exception):
         return {
             "message": "EmoGo backend is running",
             "status": "error",
             "database": "connection error",
-            "error": str(e)
+            "error": str(ping)
+        }
+    
+    response = {
+        "message": "EmoGo backend is running",
+        "status": "ok",
+        "database": "connected",
+        "collections": {
+            kind: None if isinstance(count, Exception) else count
+            for kind, count in zip(("vlogs", "sentiments", "gps"), counts)
         }
+    }
+    # Reachable but a count failed: still report what was counted
+    errors = [str(count) for count in counts if isinstance(count, Exception)]
+    if errors:
+        response["error"] = "; ".join(errors)
+    return response
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring"""
-    if db is None:
+    if app.state.db is None:
         raise HTTPException(status_code=503, detail="Database not connected")
     
     try:
-        await mongo_client.admin.command('ping')
+        await ping_database()
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Database error: {str(e)}")
@@ -153,20 +482,19 @@ async def health_check():
 # ============== WRITE ENDPOINTS ==============
 
 @app.post("/api/vlogs")
-async def create_vlog(data: Dict[str, Any] = Body(...)):
+async def create_vlog(payload: VlogData):
     """Store a new vlog entry"""
-    if db is None:
+    if app.state.db is None:
         raise HTTPException(status_code=503, detail="Database not connected")
     
     try:
-        # Add server timestamp if not provided
-        if "timestamp" not in data:
-            data["timestamp"] = datetime.utcnow().isoformat()
+        data = payload.to_document()
         
-        result = await db.vlogs.insert_one(data)
+        inserted_id = await app.state.writers["vlogs"].insert(data)
+        invalidate_read_caches()
         return {
             "status": "success",
-            "id": str(result.inserted_id),
+            "id": str(inserted_id),
             "message": "Vlog saved successfully"
         }
     except Exception as e:
@@ -174,20 +502,19 @@ async def create_vlog(data: Dict[str, Any] = Body(...)):
 
 
 @app.post("/api/sentiments")
-async def create_sentiment(data: Dict[str, Any] = Body(...)):
+async def create_sentiment(payload: SentimentData):
     """Store a new sentiment entry"""
-    if db is None:
+    if app.state.db is None:
         raise HTTPException(status_code=503, detail="Database not connected")
     
     try:
-        # Add server timestamp if not provided
-        if "timestamp" not in data:
-            data["timestamp"] = datetime.utcnow().isoformat()
+        data = payload.to_document()
         
-        result = await db.sentiments.insert_one(data)
+        inserted_id = await app.state.writers["sentiments"].insert(data)
+        invalidate_read_caches()
         return {
             "status": "success",
-            "id": str(result.inserted_id),
+            "id": str(inserted_id),
             "message": "Sentiment saved successfully"
         }
     except Exception as e:
@@ -195,802 +522,695 @@ async def create_sentiment(data: Dict[str, Any] = Body(...)):
 
 
 @app.post("/api/gps")
-async def create_gps(data: Dict[str, Any] = Body(...)):
+async def create_gps(payload: GPSData):
     """Store a new GPS coordinate entry"""
-    if db is None:
+    if app.state.db is None:
         raise HTTPException(status_code=503, detail="Database not connected")
     
     try:
-        # Add server timestamp if not provided
-        if "timestamp" not in data:
-            data["timestamp"] = datetime.utcnow().isoformat()
+        data = payload.to_document()
+        set_gps_location(data)
         
-        result = await db.gps.insert_one(data)
+        inserted_id = await app.state.writers["gps"].insert(data)
+        invalidate_read_caches()
         return {
             "status": "success",
-            "id": str(result.inserted_id),
+            "id": str(inserted_id),
             "message": "GPS data saved successfully"
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save GPS data: {str(e)}")
 
 
+async def insert_entries(collection, docs: List[Dict[str, Any]]) -> tuple:
+    """Unordered insert_many returning (inserted, duplicates); retried entries aren't errors"""
+    try:
+        result = await collection.insert_many(docs, ordered=False)
+        return len(result.inserted_ids), 0
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY_ERROR for error in errors):
+            raise
+        return e.details.get("nInserted", 0), len(errors)
+
+
 @app.post("/api/batch")
-async def create_batch(data: Dict[str, Any] = Body(...)):
+async def create_batch(payload: BatchPayload):
     """Store multiple entries at once"""
-    if db is None:
+    if app.state.db is None:
         raise HTTPException(status_code=503, detail="Database not connected")
     
     try:
-        results = {}
-        timestamp = datetime.utcnow().isoformat()
-        
-        # Insert vlogs
-        if "vlogs" in data and data["vlogs"]:
-            vlogs = data["vlogs"]
-            for vlog in vlogs:
-                if "timestamp" not in vlog:
-                    vlog["timestamp"] = timestamp
-            result = await db.vlogs.insert_many(vlogs)
-            results["vlogs"] = len(result.inserted_ids)
+        # Collect one insert per non-empty collection
+        kinds = []
+        inserts = []
+        for kind in ("vlogs", "sentiments", "gps"):
+            docs = [item.to_document() for item in getattr(payload, kind)]
+            if not docs:
+                continue
+            if kind == "gps":
+                for doc in docs:
+                    set_gps_location(doc)
+            kinds.append(kind)
+            # Unordered inserts let the server apply the batch in parallel
+            inserts.append(insert_entries(app.state.collections[kind], docs))
         
-        # Insert sentiments
-        if "sentiments" in data and data["sentiments"]:
-            sentiments = data["sentiments"]
-            for sentiment in sentiments:
-                if "timestamp" not in sentiment:
-                    sentiment["timestamp"] = timestamp
-            result = await db.sentiments.insert_many(sentiments)
-            results["sentiments"] = len(result.inserted_ids)
+        # The collections are independent, so write them concurrently
+        counts = await asyncio.gather(*inserts)
+        invalidate_read_caches()
+        results = {kind: inserted for kind, (inserted, _) in zip(kinds, counts)}
         
-        # Insert GPS data
-        if "gps" in data and data["gps"]:
-            gps_data = data["gps"]
-            for gps in gps_data:
-                if "timestamp" not in gps:
-                    gps["timestamp"] = timestamp
-            result = await db.gps.insert_many(gps_data)
-            results["gps"] = len(result.inserted_ids)
-        
-        return {
+        response = {
             "status": "success",
             "inserted": results,
             "message": "Batch data saved successfully"
         }
+        # Entries already stored by an earlier attempt of this batch
+        duplicates = {kind: dup for kind, (_, dup) in zip(kinds, counts) if dup}
+        if duplicates:
+            response["duplicates"] = duplicates
+        return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save batch data: {str(e)}")
 
 
 # ============== READ/EXPORT ENDPOINTS ==============
 
+EXPORT_BATCH_SIZE = 1000
+# Streamed exports are flushed in pieces about this big: one tiny write per
+# document would make GZipMiddleware emit many poorly compressed blocks
+EXPORT_CHUNK_BYTES = 64 * 1024
+# Every export is an _id-ordered walk; pin it to the _id index so the planner
+# never trials the timestamp/userId indexes for it
+EXPORT_HINT = {"_id": 1}
+ZIP_DOWNLOAD_CONCURRENCY = 16
+# Larger media is left out of the ZIP (with a .skipped placeholder) so one huge
+# video can't exhaust the worker's memory
+ZIP_MAX_MEDIA_BYTES = 50 * 1024 * 1024
+# Downloads are spooled (in memory up to the threshold, then to a temp file)
+# and copied into the archive chunk by chunk
+ZIP_SPOOL_MEMORY_BYTES = 1024 * 1024
+ZIP_COPY_CHUNK_BYTES = 64 * 1024
+
+# Export payloads are cached briefly; anything larger than this is only streamed
+EXPORT_CACHE_TTL = 30
+EXPORT_CACHE_MAX_BYTES = 8 * 1024 * 1024
+# Least recently used payloads are evicted past this many, bounding the cache
+# at EXPORT_CACHE_MAX_ENTRIES * EXPORT_CACHE_MAX_BYTES
+EXPORT_CACHE_MAX_ENTRIES = 8
+# Browser-side freshness of a per-kind export before it revalidates via ETag
+EXPORT_MAX_AGE = 15
+
+# Per-collection export settings. Projections only fetch the documented fields
+# from Mongo; exports never ship anything else
+EXPORT_SPECS = {
+    "vlogs": {
+        "projection": {"_id": 1, **{field: 1 for field in VlogData.model_fields}},
+        "filename": "vlogs.json",
+        "label": "vlogs",
+    },
+    "sentiments": {
+        "projection": {"_id": 1, **{field: 1 for field in SentimentData.model_fields}},
+        "filename": "sentiments.json",
+        "label": "sentiments",
+    },
+    "gps": {
+        "projection": {"_id": 1, **{field: 1 for field in GPSData.model_fields}},
+        "filename": "gps.json",
+        "label": "GPS data",
+    },
+}
+
+# The ZIP builder only needs the video URL and the bits used in filenames
+VLOG_ZIP_PROJECTION = {"vlog": 1, "media_url": 1, "video_url": 1, "url": 1, "userId": 1, "timestamp": 1}
+
+
+async def stream_json_array(cursor):
+    """Yield a cursor of JSON-native documents as a JSON array in ~EXPORT_CHUNK_BYTES pieces"""
+    buffer = bytearray(b"[")
+    separator = b""
+    async for doc in cursor:
+        buffer += separator
+        buffer += orjson.dumps(doc)
+        separator = b","
+        if len(buffer) >= EXPORT_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"]"
+    yield bytes(buffer)
+
+
+async def stream_ndjson(cursor):
+    """Yield a cursor of JSON-native documents as newline-delimited JSON"""
+    buffer = bytearray()
+    async for doc in cursor:
+        buffer += orjson.dumps(doc, option=orjson.OPT_APPEND_NEWLINE)
+        if len(buffer) >= EXPORT_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+# ?format= choices for /export/{kind}: media type and body generator
+EXPORT_FORMATS = {
+    "json": ("application/json", stream_json_array),
+    "ndjson": ("application/x-ndjson", stream_ndjson),
+}
+
+
+def parse_since_id(since_id: Optional[str]) -> Optional[ObjectId]:
+    """Validate the ?since_id= resume token"""
+    if not since_id:
+        return None
+    try:
+        return ObjectId(since_id)
+    except InvalidId:
+        raise HTTPException(status_code=400, detail=f"Invalid since_id: {since_id}")
+
+
+# Compact [timestamp, score] rows for charting, normalising the score aliases
+SENTIMENT_SERIES_PIPELINE = [
+    {"$sort": {"_id": 1}},
+    {"$project": {
+        "_id": 0,
+        "row": [
+            "$timestamp",
+            {"$convert": {
+                "input": {"$ifNull": ["$score", "$value", "$polarity"]},
+                "to": "double",
+                "onError": None,
+                "onNull": None,
+            }},
+        ],
+    }},
+]
+
+# Compact [lat, lng, timestamp] rows for mapping; a coords array wins over named fields
+GPS_POINTS_PIPELINE = [
+    {"$sort": {"_id": 1}},
+    {"$project": {
+        "_id": 0,
+        "lat": {"$cond": [
+            {"$isArray": "$coords"},
+            {"$arrayElemAt": ["$coords", 0]},
+            {"$ifNull": ["$lat", "$latitude"]},
+        ]},
+        "lng": {"$cond": [
+            {"$isArray": "$coords"},
+            {"$arrayElemAt": ["$coords", 1]},
+            {"$ifNull": ["$long", "$lng", "$longitude", "$lon"]},
+        ]},
+        "timestamp": 1,
+    }},
+    {"$match": {"lat": {"$ne": None}, "lng": {"$ne": None}}},
+    {"$project": {"row": ["$lat", "$lng", "$timestamp"]}},
+]
+
+
+def export_pipeline(kind: str, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Aggregation returning projected, _id-ordered documents for an export"""
+    # Let the server stringify ObjectIds so every document is already JSON-native
+    return [
+        {"$match": query},
+        {"$sort": {"_id": 1}},
+        {"$project": EXPORT_SPECS[kind]["projection"]},
+        {"$set": {"_id": {"$toString": "$_id"}}},
+    ]
+
+
+async def resolve_export_query(kind: str, since: Optional[ObjectId]):
+    """Build an export's _id filter and return it with the last _id and the document count it will yield"""
+    query = {"_id": {"$gt": since}} if since else {}
+    collection = app.state.db[kind]
+    
+    # Pin the export to the newest document present right now, so the resume
+    # token can be sent as a header before the body starts streaming
+    last = await collection.find_one(query, projection={"_id": 1}, sort=[("_id", -1)])
+    if last is None:
+        return query, None, 0
+    query["_id"] = {**query.get("_id", {}), "$lte": last["_id"]}
+    # Another worker can commit a document with a smaller _id after this one
+    # (ObjectIds from separate processes aren't ordered within a second), so
+    # the last _id alone doesn't identify the payload; the count catches that
+    count = await collection.count_documents(query, hint=EXPORT_HINT)
+    return query, str(last["_id"]), count
+
+
+async def open_export_cursor(kind: str, query: Dict[str, Any]):
+    """Return an _id-ordered cursor of JSON-native export documents"""
+    return await app.state.db[kind].aggregate(
+        export_pipeline(kind, query), batchSize=EXPORT_BATCH_SIZE, hint=EXPORT_HINT
+    )
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak If-None-Match comparison against one of our ETags"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip() == "*" or candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+
+def export_headers(kind: str, last_id: Optional[str], count: int, export_format: str = "json") -> Dict[str, str]:
+    """Download headers for an export: filename, X-Last-Id resume token and ETag"""
+    filename = EXPORT_SPECS[kind]["filename"]
+    tag = kind
+    if export_format != "json":
+        filename = str(PurePosixPath(filename).with_suffix(f".{export_format}"))
+        tag = f"{kind}.{export_format}"
+    headers = {
+        "Content-Disposition": f"attachment; filename={filename}",
+        # The last _id and the count identify the payload (see
+        # resolve_export_query). Weak, since GZipMiddleware may re-encode the bytes
+        "ETag": f'W/"{tag}-{last_id or "empty"}-{count}"',
+        # Lets a reloaded viewer reuse its copy briefly before revalidating
+        "Cache-Control": f"private, max-age={EXPORT_MAX_AGE}",
+    }
+    if last_id:
+        headers["X-Last-Id"] = last_id
+    return headers
+
+
+# Finished export payloads, keyed by (kind, format, last_id, count) -> (expires_at, bytes),
+# least recently used first. A write changes the last _id or the count, so
+# entries never need dropping. since_id exports are never cached: the
+# client picks the key, so each resume would add an entry
+_export_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+
+def export_cache_get(key: tuple) -> Optional[bytes]:
+    entry = _export_cache.get(key)
+    if entry is None:
+        return None
+    if entry[0] < time.monotonic():
+        _export_cache.pop(key, None)
+        return None
+    _export_cache.move_to_end(key)
+    return entry[1]
+
+
+async def cache_stream(key: tuple, chunks):
+    """Pass chunks through while keeping a copy to cache once the stream completes"""
+    parts = []
+    size = 0
+    async for chunk in chunks:
+        if parts is not None:
+            size += len(chunk)
+            if size > EXPORT_CACHE_MAX_BYTES:
+                # Too large to keep around; stream it without caching
+                parts = None
+            else:
+                parts.append(chunk)
+        yield chunk
+    
+    if parts is not None:
+        export_cache_put(key, b"".join(parts))
+
+
+def export_cache_put(key: tuple, data: bytes):
+    # Drop expired entries so stale keys don't pile up
+    now = time.monotonic()
+    for stale in [k for k, (expires, _) in _export_cache.items() if expires < now]:
+        _export_cache.pop(stale, None)
+    _export_cache[key] = (now + EXPORT_CACHE_TTL, data)
+    _export_cache.move_to_end(key)
+    while len(_export_cache) > EXPORT_CACHE_MAX_ENTRIES:
+        _export_cache.popitem(last=False)
+
+
+async def stream_json_rows(cursor):
+    """Yield the "row" field of each aggregation result as a JSON array of arrays"""
+    buffer = bytearray(b"[")
+    separator = b""
+    async for doc in cursor:
+        buffer += separator
+        buffer += orjson.dumps(doc["row"])
+        separator = b","
+        if len(buffer) >= EXPORT_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b"]"
+    yield bytes(buffer)
+
+
+class MediaTooLarge(Exception):
+    pass
+
+
+class ZipStreamBuffer:
+    """Write-only sink that lets zipfile hand over archive bytes chunk by chunk"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+# Characters that would break out of a ZIP entry name or the archive's directory
+_BAD_FILENAME_CHARS = str.maketrans({"\n": "_", "\r": "_", "/": "_", "\\": "_"})
+
+
+# Fields a vlog's video URL may be stored under, in order of preference
+_MEDIA_URL_KEYS = ("vlog", "media_url", "video_url", "url")
+
+
+def media_url(vlog: Dict[str, Any]) -> Optional[str]:
+    """Return the first non-blank video URL of a vlog document"""
+    get = vlog.get
+    return next(
+        (url for key in _MEDIA_URL_KEYS if isinstance(value := get(key), str) and (url := value.strip())),
+        None,
+    )
+
+
+def vlog_filename(idx: int, vlog: Dict[str, Any], url: str) -> str:
+    """Build a ZIP entry name, keeping the media's own extension when the URL has one"""
+    timestamp = vlog.get('timestamp', '')
+    # Server-stamped documents hold a BSON date, older/client ones an ISO string
+    date = timestamp.date().isoformat() if isinstance(timestamp, datetime) else str(timestamp)[:10]
+    user_id = str(vlog.get('userId', 'unknown')).translate(_BAD_FILENAME_CHARS)
+    suffix = PurePosixPath(urlsplit(url).path).suffix.translate(_BAD_FILENAME_CHARS) or ".mp4"
+    return f"vlog_{idx+1}_{user_id}_{date}{suffix}"
+
+
+def write_zip_manifest(zip_file: zipfile.ZipFile, manifest: List[Dict[str, Any]]):
+    """Add manifest.json to the archive, encoded one entry at a time"""
+    # Only the small JSON manifest is worth deflating
+    manifest_info = zipfile.ZipInfo('manifest.json', date_time=time.localtime()[:6])
+    manifest_info.compress_type = zipfile.ZIP_DEFLATED
+    with zip_file.open(manifest_info, 'w', force_zip64=True) as manifest_file:
+        manifest_file.write(b"[")
+        for i, entry in enumerate(manifest):
+            if i:
+                manifest_file.write(b",")
+            manifest_file.write(orjson.dumps(entry, default=str))
+        manifest_file.write(b"]")
+
+
+async def stream_vlogs_zip(cursor):
+    """Yield a ZIP archive of the videos referenced by a vlog cursor as downloads finish"""
+    buffer = ZipStreamBuffer()
+    client = app.state.http
+    # A slot is taken before a download starts and given back only once its
+    # file has been copied into the archive, so at most this many spools
+    # (in flight or waiting to be written) exist at a time
+    slots = asyncio.Semaphore(ZIP_DOWNLOAD_CONCURRENCY)
+    # Finished downloads as (url, spool or exception); None once all are in,
+    # or the exception that stopped the cursor
+    done: asyncio.Queue = asyncio.Queue()
+    tasks = []
+    # Vlogs sharing a video URL, as (position, document); the file is fetched
+    # and stored once, under the first vlog's name
+    vlogs_by_url: Dict[str, List[tuple]] = {}
+    # Vlogs without a video URL, as (position, document)
+    no_media: List[tuple] = []
+    
+    async def fetch(url):
+        spool = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MEMORY_BYTES)
+        try:
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+                # Bail out on the headers alone when the size is declared
+                size = int(response.headers.get("content-length") or 0)
+                if size > ZIP_MAX_MEDIA_BYTES:
+                    raise MediaTooLarge(f"{size} bytes exceeds the {ZIP_MAX_MEDIA_BYTES} byte limit")
+                
+                received = 0
+                async for chunk in response.aiter_bytes(ZIP_COPY_CHUNK_BYTES):
+                    received += len(chunk)
+                    if received > ZIP_MAX_MEDIA_BYTES:
+                        raise MediaTooLarge(f"more than {ZIP_MAX_MEDIA_BYTES} bytes")
+                    spool.write(chunk)
+            spool.seek(0)
+            done.put_nowait((url, spool))
+        except Exception as e:
+            spool.close()
+            done.put_nowait((url, e))
+        except BaseException:
+            # Cancelled along with the archive
+            spool.close()
+            raise
+    
+    async def start_downloads():
+        # Start each download as soon as its document arrives from Mongo
+        try:
+            idx = 0
+            async for vlog in cursor:
+                video_url = media_url(vlog)
+                if video_url in vlogs_by_url:
+                    vlogs_by_url[video_url].append((idx, vlog))
+                elif video_url:
+                    vlogs_by_url[video_url] = [(idx, vlog)]
+                    await slots.acquire()
+                    tasks.append(asyncio.create_task(fetch(video_url)))
+                else:
+                    no_media.append((idx, vlog))
+                idx += 1
+            await asyncio.gather(*tasks)
+            done.put_nowait(None)
+        except Exception as e:
+            done.put_nowait(e)
+    
+    producer = asyncio.create_task(start_downloads())
+    # Per URL, in the order the files were written: what the manifest records
+    outcomes: Dict[str, Dict[str, Any]] = {}
+    try:
+        # zipfile falls back to data descriptors on a non-seekable sink.
+        # Media is already compressed, so entries are stored as-is by default
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zip_file:
+            while (item := await done.get()) is not None:
+                if isinstance(item, Exception):
+                    raise item
+                video_url, content = item
+                try:
+                    filename = vlog_filename(*vlogs_by_url[video_url][0], video_url)
+                    
+                    if isinstance(content, MediaTooLarge):
+                        filename += ".skipped"
+                        outcomes[video_url] = {"file": filename, "skipped": str(content)}
+                        zip_file.writestr(filename, f"Skipped {video_url}: {content}\n")
+                        yield buffer.drain()
+                        continue
+                    if isinstance(content, Exception):
+                        logger.warning("Failed to download video %s: %s", video_url, content)
+                        outcomes[video_url] = {"file": None, "error": str(content)}
+                        continue
+                    
+                    outcomes[video_url] = {"file": filename}
+                    # Copy into the ZIP, handing each piece downstream as it's written
+                    with zip_file.open(filename, 'w', force_zip64=True) as entry_file:
+                        while chunk := content.read(ZIP_COPY_CHUNK_BYTES):
+                            entry_file.write(chunk)
+                            yield buffer.drain()
+                    yield buffer.drain()
+                finally:
+                    if not isinstance(content, Exception):
+                        content.close()
+                    slots.release()
+            
+            # One entry per vlog in cursor order: including ones that share a
+            # URL the cursor reached after its file was written, and ones with
+            # no video. The resolved URL goes under "media" so the document's
+            # own url field is kept as stored
+            entries = [
+                (idx, {**vlog, "media": video_url, **outcome})
+                for video_url, outcome in outcomes.items()
+                for idx, vlog in vlogs_by_url[video_url]
+            ]
+            entries += [(idx, {**vlog, "media": None, "file": None}) for idx, vlog in no_media]
+            entries.sort(key=lambda entry: entry[0])
+            manifest = [entry for _, entry in entries]
+            # Encoding and deflating a large manifest is CPU work; nothing else
+            # touches the archive meanwhile, so it can run on a worker thread
+            writing = asyncio.ensure_future(asyncio.to_thread(write_zip_manifest, zip_file, manifest))
+            try:
+                await asyncio.shield(writing)
+            except asyncio.CancelledError:
+                # The thread can't be stopped: let it finish with the archive
+                # before leaving the with block closes it from this thread
+                while not writing.done():
+                    try:
+                        await asyncio.wait([writing])
+                    except asyncio.CancelledError:
+                        pass
+                raise
+        
+        # Central directory is written when the archive closes
+        yield buffer.drain()
+    finally:
+        # Client may disconnect mid-download: stop the cursor and the downloads,
+        # then close whatever finished but was never written
+        producer.cancel()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(producer, *tasks, return_exceptions=True)
+        while not done.empty():
+            item = done.get_nowait()
+            if isinstance(item, tuple) and not isinstance(item[1], Exception):
+                item[1].close()
+
+
 @app.get("/items/{item_id}")
 def read_item(item_id: int, q: Optional[str] = None):
     return {"item_id": item_id, "q": q}
 
 
-@app.get("/export/vlogs")
-async def export_vlogs():
-    """Export all vlogs as JSON"""
-    if db is None:
+@app.get("/export/{kind}")
+async def export_kind(
+    kind: str,
+    request: Request,
+    since_id: Optional[str] = None,
+    export_format: str = Query("json", alias="format"),
+):
+    """Export all vlogs, sentiments or GPS data as a JSON array or NDJSON"""
+    spec = EXPORT_SPECS.get(kind)
+    if spec is None:
+        raise HTTPException(status_code=404, detail=f"Unknown export: {kind}")
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {export_format}")
+    media_type, stream_body = EXPORT_FORMATS[export_format]
+    if app.state.db is None:
         raise HTTPException(status_code=503, detail="Database not connected")
     
+    since = parse_since_id(since_id)
     try:
-        cursor = db.vlogs.find({})
-        vlogs = []
-        async for doc in cursor:
-            # Convert ObjectId to string
-            doc['_id'] = str(doc['_id'])
-            vlogs.append(doc)
+        query, last_id, count = await resolve_export_query(kind, since)
+        headers = export_headers(kind, last_id, count, export_format)
         
-        return JSONResponse(
-            content=vlogs,
-            headers={
-                "Content-Disposition": "attachment; filename=vlogs.json"
-            }
+        # Nothing was added since the client's copy (e.g. a reloaded viewer tab)
+        if etag_matches(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        
+        cache_key = None if since else (kind, export_format, last_id, count)
+        cached = export_cache_get(cache_key) if cache_key else None
+        if cached is not None:
+            return Response(cached, media_type=media_type, headers=headers)
+        
+        # Stream documents as the driver hands over each batch instead of buffering
+        cursor = await open_export_cursor(kind, query)
+        body = stream_body(cursor)
+        return StreamingResponse(
+            cache_stream(cache_key, body) if cache_key else body,
+            media_type=media_type,
+            headers=headers
         )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to export vlogs: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to export {spec['label']}: {str(e)}")
 
 
-@app.get("/export/sentiments")
-async def export_sentiments():
-    """Export all sentiments as JSON"""
+@app.get("/export/sentiments/series")
+async def export_sentiment_series():
+    """Export sentiments as compact [timestamp, score] pairs"""
+    db = app.state.db
     if db is None:
         raise HTTPException(status_code=503, detail="Database not connected")
     
     try:
-        cursor = db.sentiments.find({})
-        sentiments = []
-        async for doc in cursor:
-            doc['_id'] = str(doc['_id'])
-            sentiments.append(doc)
-        
-        return JSONResponse(
-            content=sentiments,
-            headers={
-                "Content-Disposition": "attachment; filename=sentiments.json"
-            }
+        cursor = await db.sentiments.aggregate(
+            SENTIMENT_SERIES_PIPELINE, batchSize=EXPORT_BATCH_SIZE, hint=EXPORT_HINT
         )
+        return StreamingResponse(stream_json_rows(cursor), media_type="application/json")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to export sentiments: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to export sentiment series: {str(e)}")
 
 
-@app.get("/export/gps")
-async def export_gps():
-    """Export all GPS data as JSON"""
+@app.get("/export/gps/points")
+async def export_gps_points():
+    """Export GPS data as compact [lat, lng, timestamp] triples"""
+    db = app.state.db
     if db is None:
         raise HTTPException(status_code=503, detail="Database not connected")
     
     try:
-        cursor = db.gps.find({})
-        gps_data = []
-        async for doc in cursor:
-            doc['_id'] = str(doc['_id'])
-            gps_data.append(doc)
-        
-        return JSONResponse(
-            content=gps_data,
-            headers={
-                "Content-Disposition": "attachment; filename=gps.json"
-            }
+        cursor = await db.gps.aggregate(
+            GPS_POINTS_PIPELINE, batchSize=EXPORT_BATCH_SIZE, hint=EXPORT_HINT
         )
+        return StreamingResponse(stream_json_rows(cursor), media_type="application/json")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to export GPS data: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to export GPS points: {str(e)}")
 
 
 @app.get("/export/vlogs/zip")
 async def export_vlogs_zip():
     """Download all videos as a ZIP file"""
+    db = app.state.db
     if db is None:
         raise HTTPException(status_code=503, detail="Database not connected")
     
     try:
-        cursor = db.vlogs.find({})
-        vlogs = []
-        async for doc in cursor:
-            vlogs.append(doc)
-        
-        if not vlogs:
-            raise HTTPException(status_code=404, detail="No vlogs found")
-        
-        # Create ZIP file in memory
-        zip_buffer = BytesIO()
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                for idx, vlog in enumerate(vlogs):
-                    # Get video URL from different possible fields
-                    video_url = vlog.get('vlog') or vlog.get('media_url') or vlog.get('video_url') or vlog.get('url')
-                    
-                    if not video_url:
-                        continue
-                    
-                    try:
-                        # Download video
-                        response = await client.get(video_url)
-                        response.raise_for_status()
-                        
-                        # Generate filename
-                        timestamp = vlog.get('timestamp', '')
-                        user_id = vlog.get('userId', 'unknown')
-                        filename = f"vlog_{idx+1}_{user_id}_{timestamp[:10]}.mp4"
-                        
-                        # Add to ZIP
-                        zip_file.writestr(filename, response.content)
-                        
-                    except Exception as e:
-                        print(f"Failed to download video {video_url}: {e}")
-                        continue
-        
-        # Prepare ZIP for download
-        zip_buffer.seek(0)
+        first = await db.vlogs.find_one({}, projection={"_id": 1})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create ZIP: {str(e)}")
+    if first is None:
+        raise HTTPException(status_code=404, detail="No vlogs found")
+    
+    try:
+        cursor = db.vlogs.find({}, projection=VLOG_ZIP_PROJECTION).batch_size(EXPORT_BATCH_SIZE)
         
         return StreamingResponse(
-            zip_buffer,
+            stream_vlogs_zip(cursor),
             media_type="application/zip",
-            headers={
-                "Content-Disposition": "attachment; filename=vlogs.zip"
-            }
+            headers={"Content-Disposition": "attachment; filename=vlogs.zip"}
         )
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create ZIP: {str(e)}")
 
 
+# The viewer page is static: read and gzip it once at import time
+STATIC_DIR = Path(__file__).parent / "static"
+EXPORT_HTML_PATH = STATIC_DIR / "export.html"
+EXPORT_HTML_BYTES = EXPORT_HTML_PATH.read_bytes()
+EXPORT_HTML_GZIP = gzip.compress(EXPORT_HTML_BYTES, 9)
+# Weak: the same page goes out gzipped, brotli-encoded or as-is
+EXPORT_HTML_ETAG = 'W/"' + hashlib.sha1(EXPORT_HTML_BYTES).hexdigest()[:16] + '"'
+
+
 @app.get("/export", response_class=HTMLResponse)
-async def export_index():
+async def export_index(request: Request):
     """Interactive HTML page with data preview and download functionality."""
-    html = """
-<!doctype html>
-<html>
-    <head>
-        <meta charset="utf-8" />
-        <meta name="viewport" content="width=device-width,initial-scale=1" />
-        <title>EmoGo Data Export & Viewer</title>
-        <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
-        <style>
-            * { box-sizing: border-box; }
-            body { 
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif; 
-                margin: 0; 
-                padding: 20px; 
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-            }
-            .container {
-                max-width: 1200px;
-                margin: 0 auto;
-                background: white;
-                border-radius: 12px;
-                padding: 32px;
-                box-shadow: 0 10px 40px rgba(0,0,0,0.2);
-            }
-            h1 {
-                color: #333;
-                margin: 0 0 12px 0;
-                font-size: 32px;
-            }
-            .subtitle {
-                color: #666;
-                margin-bottom: 32px;
-                font-size: 16px;
-            }
-            .status { 
-                padding: 16px; 
-                margin-bottom: 24px; 
-                border-radius: 8px; 
-                border-left: 4px solid;
-            }
-            .status.ok { 
-                background: #d4edda; 
-                color: #155724; 
-                border-color: #28a745;
-            }
-            .status.error { 
-                background: #f8d7da; 
-                color: #721c24; 
-                border-color: #dc3545;
-            }
-            
-            /* Tab Navigation */
-            .tabs {
-                display: flex;
-                gap: 8px;
-                margin-bottom: 24px;
-                border-bottom: 2px solid #e0e0e0;
-            }
-            .tab {
-                padding: 12px 24px;
-                background: transparent;
-                border: none;
-                cursor: pointer;
-                font-size: 16px;
-                font-weight: 600;
-                color: #666;
-                border-bottom: 3px solid transparent;
-                transition: all 0.3s;
-            }
-            .tab:hover {
-                color: #667eea;
-            }
-            .tab.active {
-                color: #667eea;
-                border-bottom-color: #667eea;
-            }
-            
-            .tab-content {
-                display: none;
-            }
-            .tab-content.active {
-                display: block;
-            }
-            
-            /* Download Buttons */
-            .download-section {
-                background: #f8f9fa;
-                padding: 20px;
-                border-radius: 8px;
-                margin-bottom: 24px;
-            }
-            .download-btn {
-                display: inline-block;
-                padding: 12px 24px;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                text-decoration: none;
-                border-radius: 6px;
-                font-weight: 600;
-                transition: all 0.3s;
-                margin-right: 12px;
-                margin-bottom: 8px;
-                box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
-            }
-            .download-btn:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 6px 16px rgba(102, 126, 234, 0.6);
-            }
-            
-            /* Video Grid */
-            .video-grid {
-                display: grid;
-                grid-template-columns: repeat(auto-fill, minmax(300px, 1fr));
-                gap: 20px;
-                margin-top: 20px;
-            }
-            .video-card {
-                background: #f8f9fa;
-                border-radius: 8px;
-                overflow: hidden;
-                box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-            }
-            .video-card video {
-                width: 100%;
-                height: 200px;
-                object-fit: cover;
-                background: #000;
-            }
-            .video-info {
-                padding: 12px;
-            }
-            .video-info h3 {
-                margin: 0 0 8px 0;
-                font-size: 14px;
-                color: #333;
-            }
-            .video-info p {
-                margin: 4px 0;
-                font-size: 12px;
-                color: #666;
-            }
-            
-            /* Sentiment Chart */
-            #sentimentChart {
-                max-height: 300px;
-                margin: 20px 0;
-            }
-            
-            /* Table */
-            table {
-                width: 100%;
-                border-collapse: collapse;
-                margin-top: 20px;
-                background: white;
-            }
-            th, td {
-                padding: 12px;
-                text-align: left;
-                border-bottom: 1px solid #e0e0e0;
-            }
-            th {
-                background: #f8f9fa;
-                font-weight: 600;
-                color: #333;
-            }
-            tr:hover {
-                background: #f8f9fa;
-            }
-            
-            /* Map */
-            #map {
-                height: 400px;
-                border-radius: 8px;
-                margin: 20px 0;
-            }
-            
-            /* Loading & Empty States */
-            .loading {
-                display: inline-block;
-                width: 16px;
-                height: 16px;
-                border: 2px solid #f3f3f3;
-                border-top: 2px solid #667eea;
-                border-radius: 50%;
-                animation: spin 1s linear infinite;
-                margin-left: 8px;
-            }
-            @keyframes spin {
-                0% { transform: rotate(0deg); }
-                100% { transform: rotate(360deg); }
-            }
-            .empty-state {
-                text-align: center;
-                padding: 60px 20px;
-                color: #999;
-            }
-            .empty-state-icon {
-                font-size: 64px;
-                margin-bottom: 16px;
-            }
-            
-            /* Stats */
-            .stats-grid {
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(150px, 1fr));
-                gap: 16px;
-                margin-bottom: 24px;
-            }
-            .stat-card {
-                background: #f8f9fa;
-                padding: 16px;
-                border-radius: 8px;
-                text-align: center;
-            }
-            .stat-number {
-                font-size: 32px;
-                font-weight: 700;
-                color: #667eea;
-                margin-bottom: 4px;
-            }
-            .stat-label {
-                font-size: 14px;
-                color: #666;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>🎥 EmoGo Data Viewer</h1>
-            <div class="subtitle">預覽和下載您收集的所有資料</div>
-            
-            <div id="status" class="status">
-                <span>正在載入資料...</span>
-                <div class="loading"></div>
-            </div>
-
-            <div class="stats-grid" id="statsGrid" style="display:none;">
-                <div class="stat-card">
-                    <div class="stat-number" id="vlogCount">0</div>
-                    <div class="stat-label">影片</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-number" id="sentimentCount">0</div>
-                    <div class="stat-label">情緒記錄</div>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-number" id="gpsCount">0</div>
-                    <div class="stat-label">GPS 點位</div>
-                </div>
-            </div>
-
-            <div class="tabs">
-                <button class="tab active" onclick="switchTab('vlogs', event)">🎬 Vlogs</button>
-                <button class="tab" onclick="switchTab('sentiments', event)">😊 Sentiments</button>
-                <button class="tab" onclick="switchTab('gps', event)">📍 GPS</button>
-            </div>
-
-            <!-- Vlogs Tab -->
-            <div id="vlogs-content" class="tab-content active">
-                <div class="download-section">
-                    <h3 style="margin:0 0 12px 0;">📥 下載選項</h3>
-                    <a href="/export/vlogs/zip" class="download-btn">📦 下載影片 ZIP</a>
-                    <a href="/export/vlogs" class="download-btn">📄 下載 JSON</a>
-                </div>
-                <h3>影片預覽</h3>
-                <div id="vlogsGrid" class="video-grid"></div>
-            </div>
-
-            <!-- Sentiments Tab -->
-            <div id="sentiments-content" class="tab-content">
-                <div class="download-section">
-                    <h3 style="margin:0 0 12px 0;">📥 下載選項</h3>
-                    <a href="/export/sentiments" class="download-btn">📊 下載情緒資料</a>
-                </div>
-                <h3>情緒分析圖表</h3>
-                <canvas id="sentimentChart"></canvas>
-                <h3>情緒記錄</h3>
-                <div id="sentimentsTable"></div>
-            </div>
-
-            <!-- GPS Tab -->
-            <div id="gps-content" class="tab-content">
-                <div class="download-section">
-                    <h3 style="margin:0 0 12px 0;">📥 下載選項</h3>
-                    <a href="/export/gps" class="download-btn">🗺️ 下載 GPS 資料</a>
-                </div>
-                <h3>位置地圖</h3>
-                <div id="map"></div>
-                <h3>GPS 記錄</h3>
-                <div id="gpsTable"></div>
-            </div>
-        </div>
-
-        <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-        <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
-        <script>
-            let currentTab = 'vlogs';
-            let mapInstance = null;
-
-            function switchTab(tabName, event) {
-                currentTab = tabName;
-                
-                // Update tab buttons
-                document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
-                event.target.classList.add('active');
-                
-                // Update content
-                document.querySelectorAll('.tab-content').forEach(c => c.classList.remove('active'));
-                document.getElementById(tabName + '-content').classList.add('active');
-                
-                // Initialize map if switching to GPS tab
-                if (tabName === 'gps' && !mapInstance) {
-                    loadGPSData();
-                }
-            }
-
-            // Check backend status
-            fetch('/').then(r => r.json()).then(data => {
-                const statusDiv = document.getElementById('status');
-                if (data.status === 'ok') {
-                    statusDiv.className = 'status ok';
-                    statusDiv.innerHTML = '✅ 資料庫連接成功';
-                    
-                    // Show stats
-                    if (data.collections) {
-                        document.getElementById('statsGrid').style.display = 'grid';
-                        document.getElementById('vlogCount').textContent = data.collections.vlogs || 0;
-                        document.getElementById('sentimentCount').textContent = data.collections.sentiments || 0;
-                        document.getElementById('gpsCount').textContent = data.collections.gps || 0;
-                    }
-                    
-                    // Load data
-                    loadVlogs();
-                    loadSentiments();
-                } else {
-                    statusDiv.className = 'status error';
-                    statusDiv.innerHTML = '❌ 資料庫連接失敗<br><small>' + (data.error || data.note || '') + '</small>';
-                }
-            }).catch(e => {
-                document.getElementById('status').className = 'status error';
-                document.getElementById('status').innerHTML = '❌ 無法連接後端';
-            });
-
-            // Load Vlogs
-            function loadVlogs() {
-                fetch('/export/vlogs')
-                    .then(r => r.json())
-                    .then(vlogs => {
-                        const grid = document.getElementById('vlogsGrid');
-                        if (!vlogs || vlogs.length === 0) {
-                            grid.innerHTML = '<div class="empty-state"><div class="empty-state-icon">📹</div><p>尚無影片資料</p></div>';
-                            return;
-                        }
-                        
-                        grid.innerHTML = vlogs.map((vlog, idx) => {
-                            // Get video URL from different possible fields
-                            const url = vlog.vlog || vlog.media_url || vlog.video_url || vlog.audio_url || vlog.url;
-                            const timestamp = vlog.timestamp ? new Date(vlog.timestamp).toLocaleString('zh-TW') : '未知時間';
-                            const userId = vlog.userId || '未知使用者';
-                            
-                            if (!url) {
-                                return '';
-                            }
-                            
-                            return `
-                                <div class="video-card">
-                                    <video controls>
-                                        <source src="${url}" type="video/mp4">
-                                        您的瀏覽器不支援影片播放
-                                    </video>
-                                    <div class="video-info">
-                                        <h3>影片 #${idx + 1}</h3>
-                                        <p>👤 ${userId}</p>
-                                        <p>🕐 ${timestamp}</p>
-                                        ${vlog.metadata && vlog.metadata.description ? `<p>📝 ${vlog.metadata.description}</p>` : ''}
-                                    </div>
-                                </div>
-                            `;
-                        }).join('');
-                    })
-                    .catch(e => {
-                        document.getElementById('vlogsGrid').innerHTML = '<div class="empty-state"><p>載入失敗: ' + e.message + '</p></div>';
-                    });
-            }
-
-            // Load Sentiments
-            function loadSentiments() {
-                fetch('/export/sentiments')
-                    .then(r => r.json())
-                    .then(sentiments => {
-                        const table = document.getElementById('sentimentsTable');
-                        
-                        if (!sentiments || sentiments.length === 0) {
-                            table.innerHTML = '<div class="empty-state"><div class="empty-state-icon">😶</div><p>尚無情緒資料</p></div>';
-                            return;
-                        }
-                        
-                        // Create chart
-                        const labels = sentiments.map((s, i) => {
-                            if (s.timestamp) {
-                                return new Date(s.timestamp).toLocaleString('zh-TW', { month: 'short', day: 'numeric', hour: '2-digit', minute: '2-digit' });
-                            }
-                            return '#' + (i + 1);
-                        });
-                        const scores = sentiments.map(s => {
-                            let score = s.score || s.value || s.polarity || 0;
-                            // 如果是字串，強制轉換為數字
-                            if (typeof score === 'string') {
-                                score = parseFloat(score);
-                            }
-                            // 確保是有效數字
-                            return typeof score === 'number' && !isNaN(score) ? score : 0;
-                        });
-                        
-                        const ctx = document.getElementById('sentimentChart').getContext('2d');
-                        new Chart(ctx, {
-                            type: 'line',
-                            data: {
-                                labels: labels,
-                                datasets: [{
-                                    label: '情緒分數',
-                                    data: scores,
-                                    borderColor: '#667eea',
-                                    backgroundColor: 'rgba(102, 126, 234, 0.1)',
-                                    tension: 0.4,
-                                    fill: true
-                                }]
-                            },
-                            options: {
-                                responsive: true,
-                                maintainAspectRatio: true,
-                                plugins: {
-                                    legend: { display: true }
-                                },
-                                scales: {
-                                    y: {
-                                        beginAtZero: false
-                                    }
-                                }
-                            }
-                        });
-                        
-                        // Create table
-                        const tableHTML = `
-                            <table>
-                                <thead>
-                                    <tr>
-                                        <th>#</th>
-                                        <th>情緒</th>
-                                        <th>分數</th>
-                                        <th>文字內容</th>
-                                        <th>使用者</th>
-                                        <th>時間</th>
-                                    </tr>
-                                </thead>
-                                <tbody>
-                                    ${sentiments.map((s, i) => {
-                                        let score = s.score || s.value || s.polarity || 0;
-                                        // 如果是字串，強制轉換為數字
-                                        if (typeof score === 'string') {
-                                            score = parseFloat(score);
-                                        }
-                                        const scoreStr = typeof score === 'number' && !isNaN(score) ? score.toFixed(2) : '-';
-                                        return `
-                                        <tr>
-                                            <td>${i + 1}</td>
-                                            <td>${s.sentiment || '-'}</td>
-                                            <td>${scoreStr}</td>
-                                            <td>${s.text || '-'}</td>
-                                            <td>${s.userId || '-'}</td>
-                                            <td>${s.timestamp ? new Date(s.timestamp).toLocaleString('zh-TW') : '-'}</td>
-                                        </tr>
-                                        `;
-                                    }).join('')}
-                                </tbody>
-                            </table>
-                        `;
-                        table.innerHTML = tableHTML;
-                    })
-                    .catch(e => {
-                        document.getElementById('sentimentsTable').innerHTML = '<div class="empty-state"><p>載入失敗: ' + e.message + '</p></div>';
-                    });
-            }
-
-            function getSentimentEmoji(sentiment) {
-                const s = (sentiment || '').toLowerCase();
-                if (s.includes('positive') || s.includes('happy') || s.includes('joy')) return '😊';
-                if (s.includes('negative') || s.includes('sad') || s.includes('angry')) return '😢';
-                return '😐';
-            }
-
-            // Load GPS
-            function loadGPSData() {
-                fetch('/export/gps')
-                    .then(r => r.json())
-                    .then(gpsData => {
-                        const table = document.getElementById('gpsTable');
-                        const mapDiv = document.getElementById('map');
-                        
-                        if (!gpsData || gpsData.length === 0) {
-                            table.innerHTML = '<div class="empty-state"><div class="empty-state-icon">📍</div><p>尚無 GPS 資料</p></div>';
-                            mapDiv.innerHTML = '<div class="empty-state"><p>無位置資料可顯示</p></div>';
-                            return;
-                        }
-                        
-                        // Extract coordinates
-                        const coords = gpsData.map(g => {
-                            let lat = g.lat || g.latitude;
-                            let lng = g.long || g.lng || g.longitude || g.lon;
-                            if (g.coords && Array.isArray(g.coords)) {
-                                lat = g.coords[0];
-                                lng = g.coords[1];
-                            }
-                            return { lat, lng, data: g };
-                        }).filter(c => c.lat && c.lng);
-                        
-                        if (coords.length === 0) {
-                            mapDiv.innerHTML = '<div class="empty-state"><p>GPS 資料格式不正確</p></div>';
-                        } else {
-                            // Initialize map
-                            mapInstance = L.map('map').setView([coords[0].lat, coords[0].lng], 13);
-                            L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
-                                maxZoom: 19,
-                                attribution: '© OpenStreetMap'
-                            }).addTo(mapInstance);
-                            
-                            // Add markers
-                            coords.forEach((c, i) => {
-                                const marker = L.marker([c.lat, c.lng]).addTo(mapInstance);
-                                const timestamp = c.data.timestamp ? new Date(c.data.timestamp).toLocaleString('zh-TW') : '未知時間';
-                                const latStr = typeof c.lat === 'number' ? c.lat.toFixed(6) : c.lat;
-                                const lngStr = typeof c.lng === 'number' ? c.lng.toFixed(6) : c.lng;
-                                marker.bindPopup(`
-                                    <strong>位置 #${i + 1}</strong><br>
-                                    經度: ${lngStr}<br>
-                                    緯度: ${latStr}<br>
-                                    時間: ${timestamp}
-                                `);
-                            });
-                            
-                            // Fit bounds
-                            if (coords.length > 1) {
-                                const bounds = L.latLngBounds(coords.map(c => [c.lat, c.lng]));
-                                mapInstance.fitBounds(bounds);
-                            }
-                        }
-                        
-                        // Create table
-                        const tableHTML = `
-                            <table>
-                                <thead>
-                                    <tr>
-                                        <th>#</th>
-                                        <th>緯度</th>
-                                        <th>經度</th>
-                                        <th>準確度</th>
-                                        <th>使用者</th>
-                                        <th>時間</th>
-                                    </tr>
-                                </thead>
-                                <tbody>
-                                    ${gpsData.map((g, i) => {
-                                        let lat = g.lat || g.latitude || '-';
-                                        let lng = g.long || g.lng || g.longitude || g.lon || '-';
-                                        if (g.coords && Array.isArray(g.coords)) {
-                                            lat = g.coords[0];
-                                            lng = g.coords[1];
-                                        }
-                                        return `
-                                        <tr>
-                                            <td>${i + 1}</td>
-                                            <td>${typeof lat === 'number' ? lat.toFixed(6) : lat}</td>
-                                            <td>${typeof lng === 'number' ? lng.toFixed(6) : lng}</td>
-                                            <td>${g.accuracy ? g.accuracy.toFixed(2) + 'm' : '-'}</td>
-                                            <td>${g.userId || '-'}</td>
-                                            <td>${g.timestamp ? new Date(g.timestamp).toLocaleString('zh-TW') : '-'}</td>
-                                        </tr>
-                                        `;
-                                    }).join('')}
-                                </tbody>
-                            </table>
-                        `;
-                        table.innerHTML = tableHTML;
-                    })
-                    .catch(e => {
-                        document.getElementById('gpsTable').innerHTML = '<div class="empty-state"><p>載入失敗: ' + e.message + '</p></div>';
-                    });
-            }
-        </script>
-    </body>
-</html>
-    """
-    return HTMLResponse(content=html)
+    headers = {
+        "Cache-Control": "public, max-age=3600",
+        "ETag": EXPORT_HTML_ETAG,
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request, EXPORT_HTML_ETAG):
+        return Response(status_code=304, headers=headers)
+    
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(EXPORT_HTML_GZIP, media_type="text/html; charset=utf-8", headers=headers)
+    
+    # FileResponse hands the file to the socket with sendfile where available
+    return FileResponse(EXPORT_HTML_PATH, media_type="text/html; charset=utf-8", headers=headers)
+
+
+app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+
+
+if __name__ == "__main__":
+    import uvicorn
+    
+    # Same event loop and HTTP parser as the Render start command
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        loop="uvloop",
+        http="httptools",
+    )
@@ -0,0 +1,55 @@
+"""One-off migration: convert ISO-string timestamps to BSON dates
+
+Older entries (and clients that send their own timestamp) stored `timestamp`
+as an ISO-8601 string, while new server-stamped entries use BSON dates. Mixed
+types sort and range-compare separately, so convert the strings in place.
+Strings MongoDB can't parse as a date are left untouched.
+
+Usage:
+    MONGO_URI=... MONGO_DB=emogo python migrate_timestamps.py [--dry-run]
+"""
+import os
+import argparse
+
+from pymongo import MongoClient
+
+COLLECTIONS = ("vlogs", "sentiments", "gps")
+STRING_TIMESTAMP = {"timestamp": {"$type": "string"}}
+
+# Update pipeline: parse on the server, keep the original value if it fails
+TO_DATE = [
+    {"$set": {
+        "timestamp": {"$convert": {
+            "input": "$timestamp",
+            "to": "date",
+            "onError": "$timestamp",
+            "onNull": "$timestamp",
+        }},
+    }},
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="only count string timestamps")
+    args = parser.parse_args()
+
+    client = MongoClient(os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    db = client[os.getenv("MONGO_DB", "emogo")]
+
+    try:
+        for name in COLLECTIONS:
+            pending = db[name].count_documents(STRING_TIMESTAMP)
+            if args.dry_run or not pending:
+                print(f"{name}: {pending} string timestamps")
+                continue
+
+            db[name].update_many(STRING_TIMESTAMP, TO_DATE)
+            remaining = db[name].count_documents(STRING_TIMESTAMP)
+            print(f"{name}: converted {pending - remaining} of {pending} ({remaining} unparseable left as-is)")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+// Parses and formats a streamed NDJSON export off the page's main thread.
+// One worker per stream: the page posts {type: 'start', kind}, then the raw
+// response chunks, then {type: 'end'}. Rows come back in batches already
+// formatted for the tables; GPS coordinates arrive as transferred typed arrays.
+importScripts('format.js');
+
+const STREAM_BATCH_ROWS = 200;
+
+let kind = null;
+let decoder = null;
+let pending = '';
+let rows = [];
+let index = 0;
+
+self.onmessage = ({ data }) => {
+    try {
+        if (data.type === 'start') {
+            kind = data.kind;
+            decoder = new TextDecoder();
+        } else if (data.type === 'chunk') {
+            parse(decoder.decode(data.chunk, { stream: true }));
+            if (rows.length >= STREAM_BATCH_ROWS) flush();
+        } else if (data.type === 'end') {
+            parse(decoder.decode() + '\n');
+            flush();
+            self.postMessage({ type: 'done' });
+        }
+    } catch (e) {
+        self.postMessage({ type: 'error', message: e.message });
+    }
+};
+
+function parse(text) {
+    pending += text;
+    let start = 0;
+    let newline;
+    while ((newline = pending.indexOf('\n', start)) !== -1) {
+        if (newline > start) rows.push(JSON.parse(pending.slice(start, newline)));
+        start = newline + 1;
+    }
+    pending = pending.slice(start);
+}
+
+function flush() {
+    if (rows.length === 0) return;
+    const batch = kind === 'gps' ? formatGPS(rows) : formatSentiments(rows, index);
+    index += rows.length;
+    rows = [];
+    self.postMessage(batch.message, batch.transfer);
+}
+
+function sentimentScore(s) {
+    let score = s.score || s.value || s.polarity || 0;
+    // 如果是字串，強制轉換為數字
+    if (typeof score === 'string') {
+        score = parseFloat(score);
+    }
+    return typeof score === 'number' ? score : NaN;
+}
+
+// Table cells (minus the row number), chart scores and chart labels
+function formatSentiments(sentiments, offset) {
+    const cells = new Array(sentiments.length);
+    const scores = new Array(sentiments.length);
+    const labels = new Array(sentiments.length);
+    for (let i = 0; i < sentiments.length; i++) {
+        const s = sentiments[i];
+        const score = sentimentScore(s);
+        cells[i] = [
+            s.sentiment ? getSentimentEmoji(s.sentiment) + ' ' + s.sentiment : '-',
+            isNaN(score) ? '-' : score.toFixed(2),
+            s.text || '-',
+            s.userId || '-',
+            s.timestamp ? formatTimestamp(s.timestamp) : '-'
+        ];
+        // 確保是有效數字
+        scores[i] = isNaN(score) ? 0 : score;
+        labels[i] = s.timestamp ? formatChartLabel(s.timestamp) : '#' + (offset + i + 1);
+    }
+    return { message: { type: 'rows', count: sentiments.length, cells, scores, labels }, transfer: [] };
+}
+
+// Clients send coordinates under one of several field names. Rather than
+// walking the whole fallback chain for every row, pick accessors once per
+// batch from its first row; a row that doesn't match them (the accessor
+// returns undefined) falls back to the generic lookup.
+function genericLat(g) {
+    return Array.isArray(g.coords) ? g.coords[0] : g.lat || g.latitude;
+}
+
+function genericLng(g) {
+    return Array.isArray(g.coords) ? g.coords[1] : g.long || g.lng || g.longitude || g.lon;
+}
+
+const LAT_READERS = { lat: g => g.lat, latitude: g => g.latitude };
+const LNG_READERS = { long: g => g.long, lng: g => g.lng, longitude: g => g.longitude, lon: g => g.lon };
+const COORDS_READERS = [g => g.coords && g.coords[0], g => g.coords && g.coords[1]];
+
+function pickReaders(sample) {
+    if (Array.isArray(sample.coords)) return COORDS_READERS;
+    const latKey = Object.keys(LAT_READERS).find(key => sample[key] != null);
+    const lngKey = Object.keys(LNG_READERS).find(key => sample[key] != null);
+    return [latKey ? LAT_READERS[latKey] : genericLat, lngKey ? LNG_READERS[lngKey] : genericLng];
+}
+
+function fixed(value, digits, suffix = '') {
+    return Number.isFinite(value) ? value.toFixed(digits) + suffix : '-';
+}
+
+// Normalize GPS rows into typed arrays; missing or non-numeric coordinates
+// become NaN. The display strings are built here once, since the table and
+// the popups would otherwise call toFixed on every redraw. times holds
+// formatted strings, or null when absent. The batch's bounding box is
+// tracked in the same loop so the map never has to walk the points for it.
+function formatGPS(points) {
+    const count = points.length;
+    const lats = new Float64Array(count);
+    const lngs = new Float64Array(count);
+    const accs = new Float64Array(count);
+    const latTexts = new Array(count);
+    const lngTexts = new Array(count);
+    const accTexts = new Array(count);
+    const userIds = new Array(count);
+    const times = new Array(count);
+    const [readLat, readLng] = pickReaders(points[0]);
+    let minLat = Infinity, maxLat = -Infinity, minLng = Infinity, maxLng = -Infinity;
+    for (let i = 0; i < count; i++) {
+        const g = points[i];
+        let lat = readLat(g);
+        let lng = readLng(g);
+        if (lat === undefined) lat = genericLat(g);
+        if (lng === undefined) lng = genericLng(g);
+        lats[i] = lat == null ? NaN : Number(lat);
+        lngs[i] = lng == null ? NaN : Number(lng);
+        if (Number.isFinite(lats[i]) && Number.isFinite(lngs[i])) {
+            if (lats[i] < minLat) minLat = lats[i];
+            if (lats[i] > maxLat) maxLat = lats[i];
+            if (lngs[i] < minLng) minLng = lngs[i];
+            if (lngs[i] > maxLng) maxLng = lngs[i];
+        }
+        accs[i] = g.accuracy ? Number(g.accuracy) : NaN;
+        latTexts[i] = fixed(lats[i], 6);
+        lngTexts[i] = fixed(lngs[i], 6);
+        accTexts[i] = fixed(accs[i], 2, 'm');
+        userIds[i] = g.userId || '-';
+        times[i] = g.timestamp ? formatTimestamp(g.timestamp) : null;
+    }
+    return {
+        message: {
+            type: 'rows', count, lats, lngs, accs, latTexts, lngTexts, accTexts, userIds, times,
+            bounds: [minLat, minLng, maxLat, maxLng]
+        },
+        transfer: [lats.buffer, lngs.buffer, accs.buffer]
+    };
+}
@@ -0,0 +1,42 @@
+// Display formatting shared by the viewer page and export-worker.js
+
+// Timestamps are formatted by hand from the Date fields with a two-digit
+// lookup table rather than through Intl, which is several times slower per
+// call. The output matches zh-TW's toLocaleString() exactly: 2026/3/4 下午3:06:07
+// for rows, 3月4日 下午03:06 for chart labels, both in local time.
+const TT = Array.from({ length: 100 }, (_, i) => String(i).padStart(2, '0'));
+
+function fmtTs(date) {
+    const hours = date.getHours();
+    return date.getFullYear() + '/' + (date.getMonth() + 1) + '/' + date.getDate() + ' ' +
+        (hours < 12 ? '上午' : '下午') + (hours % 12 || 12) + ':' +
+        TT[date.getMinutes()] + ':' + TT[date.getSeconds()];
+}
+
+function formatTimestamp(timestamp) {
+    const date = new Date(timestamp);
+    return isNaN(date) ? 'Invalid Date' : fmtTs(date);
+}
+
+function formatChartLabel(timestamp) {
+    const date = new Date(timestamp);
+    if (isNaN(date)) return 'Invalid Date';
+    const hours = date.getHours();
+    return (date.getMonth() + 1) + '月' + date.getDate() + '日 ' +
+        (hours < 12 ? '上午' : '下午') + TT[hours % 12 || 12] + ':' + TT[date.getMinutes()];
+}
+
+// Labels repeat a lot, so classify each distinct one only once
+const EMOJI_CACHE = new Map();
+const POS_RE = /positive|happy|joy/i;
+const NEG_RE = /negative|sad|angry/i;
+
+function getSentimentEmoji(sentiment) {
+    const s = sentiment || '';
+    let emoji = EMOJI_CACHE.get(s);
+    if (emoji === undefined) {
+        emoji = POS_RE.test(s) ? '😊' : NEG_RE.test(s) ? '😢' : '😐';
+        EMOJI_CACHE.set(s, emoji);
+    }
+    return emoji;
+}